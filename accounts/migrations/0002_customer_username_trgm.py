@@ -0,0 +1,42 @@
+# Trigram indexes for CustomerAdmin's search_fields (username, email), which
+# the customer autocomplete on the invoice form also queries. On PostgreSQL
+# Django compiles field__icontains to UPPER("field"::text) LIKE UPPER(%s), so
+# both indexes are built on that expression. Both columns have to be indexed
+# because the admin ORs them together. The username index also serves the
+# created_by__username term of the InvoiceAdmin and BalanceAdmin searches.
+# No-op on other database backends.
+
+from django.db import migrations
+
+INDEXES = {
+    'customer_username_upper_trgm': 'upper(username::text) gin_trgm_ops',
+    'customer_email_upper_trgm': 'upper(email::text) gin_trgm_ops',
+}
+
+
+def create_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, expression in INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON accounts_customer USING gin ({expression})'
+        )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes),
+    ]
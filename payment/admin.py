@@ -1,5 +1,14 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from .models import *
+
+
+class DisplayedFieldsChangeList(ChangeList):
+    # Only fetch the columns the changelist actually renders
+    def get_queryset(self, request):
+        return super().get_queryset(request).only(*self.model_admin.changelist_only_fields)
+
+
 class InvoiceAdmin(admin.ModelAdmin):
     list_display = ('order_id', 'created_by', 'product_name', 'status', 'sold', 'created_at')
     list_filter = ('sold', 'status', 'created_at', 'decrypted')
@@ -24,8 +33,20 @@ class InvoiceAdmin(admin.ModelAdmin):
     # Add date hierarchy for better navigation
     date_hierarchy = 'created_at'
     
-    # Optimize the form for editing
-    raw_id_fields = ('created_by', 'product')  # Use popup selectors instead of dropdowns
+    # Optimize the form for editing: searchable selects that query on demand
+    # (CustomerAdmin and ProductAdmin provide the search_fields)
+    autocomplete_fields = ('created_by', 'product')
+
+    # Skip the unfiltered COUNT(*) behind the "(N total)" label
+    show_full_result_count = False
+
+    changelist_only_fields = (
+        'order_id', 'created_by', 'created_by__username', 'product', 'product__name',
+        'status', 'sold', 'created_at',
+    )
+
+    def get_changelist(self, request, **kwargs):
+        return DisplayedFieldsChangeList
 
 admin.site.register(Invoice, InvoiceAdmin)
 class BalanceAdmin(admin.ModelAdmin):
@@ -35,6 +56,13 @@ class BalanceAdmin(admin.ModelAdmin):
     
     list_editable = ('balance',)
 
+    list_select_related = ('created_by',)
+    show_full_result_count = False
+    changelist_only_fields = ('created_by', 'created_by__username', 'address', 'balance')
+
+    def get_changelist(self, request, **kwargs):
+        return DisplayedFieldsChangeList
+
 admin.site.register(Balance, BalanceAdmin)
 
 class Telegram_ClientAdmin(admin.ModelAdmin):
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-15 22:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['product', 'received'], name='inv_product_received_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Trigram index for the order_id term of the InvoiceAdmin search. On
+# PostgreSQL Django compiles order_id__icontains to
+# UPPER("order_id"::text) LIKE UPPER(%s), so the index is built on that
+# expression rather than on the bare column. The other InvoiceAdmin search
+# fields (customer username, product name) live on joined tables and are
+# indexed in their own apps. Every insert into payment_invoice, including the
+# bulk loads from generate_random_invoices, has to maintain this index.
+# No-op on other database backends.
+
+from django.db import migrations
+
+INDEX_NAME = 'invoice_order_id_upper_trgm'
+
+
+def create_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON payment_invoice USING gin (upper(order_id::text) gin_trgm_ops)'
+    )
+
+
+def drop_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0002_invoice_inv_product_received_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_index, drop_trgm_index),
+    ]
@@ -17,6 +17,13 @@ class Invoice(models.Model):
     created_by = models.ForeignKey(Customer, on_delete=models.CASCADE)
     sold = models.BooleanField(default=False)
     decrypted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Lets received-vs-product.price comparisons (sync_invoice_prices) use the index
+            models.Index(fields=['product', 'received'], name='inv_product_received_idx'),
+        ]
+
     def __str__(self):
         return self.product.name
     
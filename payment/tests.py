@@ -1,3 +1,37 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from accounts.models import Customer
+from store.models import Category, Product
+from .models import Balance, Invoice
+
+
+class ChangelistQueryTests(TestCase):
+    # The changelists fetch only changelist_only_fields; a list_display column
+    # missing from that tuple is loaded with one extra query per row
+    ROWS = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Customer.objects.create_superuser('admin@example.com', 'admin', 'password')
+        category = Category.objects.create(name='Cards')
+        for i in range(cls.ROWS):
+            customer = Customer.objects.create(email=f'buyer{i}@example.com', username=f'buyer{i}')
+            product = Product.objects.create(category=category, name=f'Card {i}', price=5)
+            Invoice.objects.create(product=product, created_by=customer, order_id=f'INV-{i}')
+            Balance.objects.create(created_by=customer, address=f'addr{i}', balance=i)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_invoice_changelist(self):
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('admin:payment_invoice_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'INV-29')
+
+    def test_balance_changelist(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('admin:payment_balance_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'addr29')
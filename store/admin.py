@@ -18,7 +18,7 @@ admin.site.register(Category, CategoryAdmin)
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_filter = ('name',"price")
-    search_fields = ('price','category')
+    search_fields = ('name','price','category__name')
     list_display = ('name', 'price', 'balance', 'Status')
     
     list_editable = ('balance','price','Status')
@@ -0,0 +1,69 @@
+import csv
+import gzip
+import tempfile
+import threading
+
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Product, ProductExport
+
+
+def export_products_to(file):
+    """Write every product as CSV to an open text file and return the row count"""
+    # Get all field names from the Product model (excluding category since we'll handle it specially)
+    field_names = [field.name for field in Product._meta.fields if field.name != 'category']
+
+    # Create a custom header with category_name and category_location instead of just category
+    header = ['category_name', 'category_location'] + field_names
+
+    # Stream plain tuples (category name and location first, then all other fields)
+    # straight from the database, skipping model instantiation
+    rows = Product.objects.values_list(
+        'category__name', 'category__location', *field_names
+    ).iterator(chunk_size=2000)
+
+    exported = 0
+
+    def counted(rows):
+        nonlocal exported
+        for row in rows:
+            exported += 1
+            yield row
+
+    writer = csv.writer(file)
+    writer.writerow(header)
+    writer.writerows(counted(rows))
+    return exported
+
+
+def run_product_export(export_id):
+    """Generate the gzipped CSV for a ProductExport and store it on the record"""
+    try:
+        export = ProductExport.objects.get(pk=export_id)
+        export.status = 'running'
+        export.started = timezone.now()
+        export.save(update_fields=['status', 'started'])
+        with tempfile.TemporaryFile() as tmp:
+            with gzip.open(tmp, 'wt', compresslevel=1, newline='') as file:
+                rows = export_products_to(file)
+            tmp.seek(0)
+            export.file.save(f'products-{export.pk}.csv.gz', File(tmp), save=False)
+        export.rows = rows
+        export.status = 'ready'
+        export.save(update_fields=['file', 'rows', 'status'])
+    except Exception as e:
+        # Works whether or not the record could be loaded above
+        ProductExport.objects.filter(pk=export_id).update(status='failed', error=str(e))
+    finally:
+        close_old_connections()
+
+
+def start_product_export(user=None):
+    """Create a ProductExport and build its file on a background thread once the row is committed"""
+    export = ProductExport.objects.create(created_by=user)
+    transaction.on_commit(
+        lambda: threading.Thread(target=run_product_export, args=(export.pk,), daemon=True).start()
+    )
+    return export
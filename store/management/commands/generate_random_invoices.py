@@ -1,14 +1,38 @@
+import base64
+import csv
+import io
+import os
 import random
 import string
 from datetime import datetime, timedelta
+from functools import lru_cache
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
-from django.db import models
+from django.db import connection, models, transaction
 from payment.models import Invoice
 from accounts.models import Customer
 from store.models import Product
 
 
+# Invoice columns in the order build_rows() emits them
+INVOICE_FIELDS = (
+    'product_id', 'status', 'order_id', 'address', 'btcvalue', 'received', 'txid',
+    'rbf', 'created_at', 'created_by_id', 'sold', 'decrypted',
+)
+
+
+# The id pools are cached per process so scripts that call this command
+# repeatedly (e.g. via call_command) don't re-query them on every run
+@lru_cache(maxsize=1)
+def _active_product_ids():
+    return tuple(Product.objects.filter(Status=True).values_list('pk', flat=True))
+
+
+@lru_cache(maxsize=1)
+def _active_customer_ids():
+    return tuple(Customer.objects.filter(is_active=True).values_list('pk', flat=True))
+
+
 class Command(BaseCommand):
     help = 'Generate random invoices with specified count and date range'
 
@@ -41,6 +65,25 @@ class Command(BaseCommand):
             type=str,
             help='Specific user email or username to use (optional, otherwise random)'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of invoices to insert per bulk_create/COPY batch (default: 1000)'
+        )
+        parser.add_argument(
+            '--use-copy',
+            action='store_true',
+            help=(
+                'Load invoices with PostgreSQL COPY instead of the ORM (bypasses model '
+                'signals and field defaults; pair with a large --batch-size such as 50000)'
+            )
+        )
+        parser.add_argument(
+            '--refresh-pools',
+            action='store_true',
+            help='Reload the cached active product/customer ids before generating'
+        )
 
     def handle(self, *args, **options):
         count = options['count']
@@ -48,6 +91,13 @@ class Command(BaseCommand):
         end_date_str = options['end_date']
         fixed_status = options.get('status')
         user_identifier = options.get('user')
+        batch_size = options['batch_size']
+        use_copy = options['use_copy']
+
+        if count <= 0:
+            raise CommandError('count must be a positive integer')
+        if batch_size <= 0:
+            raise CommandError('--batch-size must be a positive integer')
 
         # Parse dates
         try:
@@ -59,9 +109,13 @@ class Command(BaseCommand):
         if start_date > end_date:
             raise CommandError('Start date cannot be after end date')
 
-        # Get available products
-        products = list(Product.objects.filter(Status=True))
-        if not products:
+        if options['refresh_pools']:
+            _active_product_ids.cache_clear()
+            _active_customer_ids.cache_clear()
+
+        # Get available products (only the primary keys are needed for the FK)
+        product_ids = _active_product_ids()
+        if not product_ids:
             raise CommandError('No active products found')
 
         # Handle customer selection
@@ -72,7 +126,7 @@ class Command(BaseCommand):
                     models.Q(email=user_identifier) | models.Q(username=user_identifier),
                     is_active=True
                 )
-                customers = [customer]  # Use only this customer
+                customer_ids = [customer.pk]  # Use only this customer
                 self.stdout.write(f'Using specific customer: {customer.username} ({customer.email})')
             except Customer.DoesNotExist:
                 raise CommandError(f'Customer not found with email/username: {user_identifier}')
@@ -80,61 +134,44 @@ class Command(BaseCommand):
                 raise CommandError(f'Multiple customers found with identifier: {user_identifier}')
         else:
             # Get all active customers for random selection
-            customers = list(Customer.objects.filter(is_active=True))
-            if not customers:
+            customer_ids = _active_customer_ids()
+            if not customer_ids:
                 raise CommandError('No active customers found')
 
+        if use_copy and connection.vendor != 'postgresql':
+            self.stdout.write(
+                self.style.WARNING('--use-copy requires PostgreSQL; falling back to bulk_create')
+            )
+            use_copy = False
+
         # Status choices
         status_choices = [-1, 0, 1, 2]
 
-        # Generate invoices
-        invoices_created = 0
-        for i in range(count):
-            try:
-                # Random date between start and end
-                random_date = self.random_date(start_date, end_date)
-                random_datetime = timezone.make_aware(
-                    datetime.combine(random_date, datetime.min.time())
-                )
+        # created_at is local midnight of a random day in the range
+        start_datetime = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+        days_between = (end_date - start_date).days
 
-                # Random product and customer selection
-                product = random.choice(products)
-                if len(customers) == 1:
-                    # Use the specific customer
-                    customer = customers[0]
-                else:
-                    # Random customer selection
-                    customer = random.choice(customers)
-
-                # Generate random data
-                order_id = self.generate_order_id()
-                status = fixed_status if fixed_status is not None else random.choice(status_choices)
-                
-                # Create invoice
-                invoice = Invoice.objects.create(
-                    product=product,
-                    status=status,
-                    order_id=order_id,
-                    address=self.generate_random_address(),
-                    btcvalue=round(random.uniform(0.001, 1.0), 6),
-                    received=round(random.uniform(0.0, 0.5), 6),
-                    txid=self.generate_txid() if random.choice([True, False]) else None,
-                    rbf=random.randint(0, 2) if random.choice([True, False]) else None,
-                    created_at=random_datetime,
-                    created_by=customer,
-                    sold=random.choice([True, False]),
-                    decrypted=random.choice([True, False])
+        # Generate invoices one batch at a time; random fields are drawn per batch
+        invoices_created = 0
+        with transaction.atomic():
+            for offset in range(0, count, batch_size):
+                size = min(batch_size, count - offset)
+                statuses = (
+                    [fixed_status] * size if fixed_status is not None
+                    else random.choices(status_choices, k=size)
                 )
-                
-                invoices_created += 1
-                
-                if invoices_created % 100 == 0:
-                    self.stdout.write(f'Created {invoices_created} invoices...')
-
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'Error creating invoice {i+1}: {str(e)}')
+                rows = self.build_rows(
+                    size, product_ids, customer_ids, statuses, start_datetime, days_between
                 )
+                if use_copy:
+                    self.copy_rows(rows)
+                else:
+                    Invoice.objects.bulk_create(
+                        [Invoice(**dict(zip(INVOICE_FIELDS, row))) for row in rows],
+                        batch_size=batch_size
+                    )
+                invoices_created += size
+                self.stdout.write(f'Created {invoices_created} invoices...')
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -143,25 +180,84 @@ class Command(BaseCommand):
             )
         )
 
-    def random_date(self, start_date, end_date):
-        """Generate a random date between start_date and end_date"""
-        time_between = end_date - start_date
-        days_between = time_between.days
-        random_days = random.randrange(days_between + 1)
-        return start_date + timedelta(days=random_days)
-
-    def generate_order_id(self):
-        """Generate a random order ID"""
-        return 'INV-' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=12))
-
-    def generate_random_address(self):
-        """Generate a random Bitcoin-like address"""
-        if random.choice([True, False]):
-            # Generate a random address
-            address_chars = string.ascii_letters + string.digits
-            return ''.join(random.choices(address_chars, k=random.randint(26, 35)))
-        return None
-
-    def generate_txid(self):
-        """Generate a random transaction ID"""
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=64)) 
\ No newline at end of file
+    def build_rows(self, size, product_ids, customer_ids, statuses, start_datetime, days_between):
+        """Build `size` invoice rows ordered as INVOICE_FIELDS, generating each random column for the whole batch"""
+        batch_products = random.choices(product_ids, k=size)
+        batch_customers = random.choices(customer_ids, k=size)
+        created_at = [
+            start_datetime + timedelta(days=days)
+            for days in random.choices(range(days_between + 1), k=size)
+        ]
+        order_ids = self.generate_order_ids(size)
+        addresses = self.generate_random_addresses(size)
+        btcvalues = [round(0.001 + 0.999 * r, 6) for r in self.random_floats(size)]
+        received = [round(0.5 * r, 6) for r in self.random_floats(size)]
+        has_txid = self.random_flags(size)
+        txids = iter(self.generate_txids(sum(has_txid)))
+        has_rbf = self.random_flags(size)
+        rbf_values = random.choices((0, 1, 2), k=size)
+        sold = self.random_flags(size)
+        decrypted = self.random_flags(size)
+
+        return list(zip(
+            batch_products,
+            statuses,
+            order_ids,
+            addresses,
+            btcvalues,
+            received,
+            [next(txids) if flag else None for flag in has_txid],
+            [value if flag else None for value, flag in zip(rbf_values, has_rbf)],
+            created_at,
+            batch_customers,
+            sold,
+            decrypted,
+        ))
+
+    def copy_rows(self, rows):
+        """Stream invoice rows into the invoice table with a single COPY FROM STDIN"""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+
+        columns = ', '.join(Invoice._meta.get_field(name).column for name in INVOICE_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {Invoice._meta.db_table} ({columns}) FROM STDIN WITH CSV',
+                buffer
+            )
+
+    def random_floats(self, size):
+        """Generate `size` floats in [0.0, 1.0) (the stdlib has no bulk float draw, so one random() per row)"""
+        return [random.random() for _ in range(size)]
+
+    def random_flags(self, size):
+        """Generate `size` random booleans with a single random.choices call"""
+        return random.choices((True, False), k=size)
+
+    def random_strings(self, alphabet, lengths):
+        """Generate one random string per entry in `lengths` from a single draw"""
+        pool = ''.join(random.choices(alphabet, k=sum(lengths)))
+        strings = []
+        pos = 0
+        for length in lengths:
+            strings.append(pool[pos:pos + length])
+            pos += length
+        return strings
+
+    def generate_order_ids(self, size):
+        """Generate `size` random order IDs (12 base32 characters each)"""
+        pool = base64.b32encode(os.urandom(size * 8)).decode()
+        return ['INV-' + pool[i:i + 12] for i in range(0, size * 12, 12)]
+
+    def generate_random_addresses(self, size):
+        """Generate `size` random Bitcoin-like addresses, roughly half of them None"""
+        has_address = self.random_flags(size)
+        lengths = random.choices(range(26, 36), k=sum(has_address))
+        addresses = iter(self.random_strings(string.ascii_letters + string.digits, lengths))
+        return [next(addresses) if flag else None for flag in has_address]
+
+    def generate_txids(self, size):
+        """Generate `size` random 64-character hex transaction IDs"""
+        pool = os.urandom(size * 32).hex()
+        return [pool[i:i + 64] for i in range(0, size * 64, 64)]
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction, models
+from django.db import connection, transaction, models
 from payment.models import Invoice
+from store.models import Product
 
 
 class Command(BaseCommand):
@@ -23,108 +24,173 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip invoices where product.price is null'
         )
+        parser.add_argument(
+            '--exact-count',
+            action='store_true',
+            help=(
+                'Run an exact COUNT(*) for dry-run progress instead of using the planner estimate '
+                '(the estimate covers the whole invoice table, so with --filter-null-prices '
+                'progress may finish short of 100%%)'
+            )
+        )
 
     def handle(self, *args, **options):
         batch_size = options['batch_size']
         dry_run = options['dry_run']
         filter_null_prices = options['filter_null_prices']
 
-        if dry_run:
-            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+        if not dry_run:
+            # The whole sync is one join-update; no invoice rows come back to Python
+            with transaction.atomic():
+                updated_count = self.sync_in_database(filter_null_prices)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully updated {updated_count} invoices with product prices.'
+                )
+            )
+            self.show_statistics()
+            return
+
+        self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
 
         # Build queryset with optimized joins
-        queryset = Invoice.objects.select_related('product').all()
+        queryset = Invoice.objects.select_related('product').order_by('id')
         
         if filter_null_prices:
             queryset = queryset.exclude(product__price__isnull=True)
 
-        total_invoices = queryset.count()
-        self.stdout.write(f'Found {total_invoices} invoices to process')
-
-        if total_invoices == 0:
-            self.stdout.write(self.style.SUCCESS('No invoices to update'))
-            return
+        # Progress only needs a denominator; avoid a full COUNT(*) unless asked for
+        total_invoices = None if options['exact_count'] else self.estimate_rows()
+        approx = '~'
+        if total_invoices is None:
+            total_invoices = queryset.count()
+            approx = ''
+        if approx and filter_null_prices:
+            self.stdout.write(
+                f'Found {approx}{total_invoices} invoices in total '
+                '(estimate is taken before --filter-null-prices is applied)'
+            )
+        else:
+            self.stdout.write(f'Found {approx}{total_invoices} invoices to process')
 
         updated_count = 0
         skipped_count = 0
         processed_count = 0
-
-        # Process in batches for memory efficiency
-        with transaction.atomic():
-            while processed_count < total_invoices:
-                # Get batch with offset
-                batch = list(queryset[processed_count:processed_count + batch_size])
-                
-                if not batch:
-                    break
-
-                # Prepare list of invoices to update
-                invoices_to_update = []
-                
-                for invoice in batch:
-                    product_price = invoice.product.price
-                    current_received = invoice.received
-
-                    # Skip if product price is null and we're filtering
-                    if product_price is None and filter_null_prices:
-                        skipped_count += 1
-                        continue
-
-                    # Only update if values are different
-                    if current_received != product_price:
-                        invoice.received = product_price
-                        invoices_to_update.append(invoice)
-
-                # Bulk update if we have invoices to update
-                if invoices_to_update and not dry_run:
-                    Invoice.objects.bulk_update(
-                        invoices_to_update, 
-                        ['received'], 
-                        batch_size=batch_size
-                    )
-                    updated_count += len(invoices_to_update)
-                elif invoices_to_update and dry_run:
-                    # In dry run, just count what would be updated
-                    updated_count += len(invoices_to_update)
-                    for invoice in invoices_to_update[:5]:  # Show first 5 examples
-                        self.stdout.write(
-                            f'Would update Invoice {invoice.id}: '
-                            f'received {invoice.received} -> {invoice.product.price}'
-                        )
-                    if len(invoices_to_update) > 5:
-                        self.stdout.write(f'... and {len(invoices_to_update) - 5} more in this batch')
-
-                processed_count += len(batch)
-
-                # Progress update every batch
-                if processed_count % (batch_size * 5) == 0 or processed_count >= total_invoices:
+        last_id = 0
+
+        # Process in batches for memory efficiency, paging on the primary key
+        # so each batch is an index range scan instead of a growing OFFSET
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            # Prepare list of invoices that would be updated
+            invoices_to_update = []
+            
+            for invoice in batch:
+                product_price = invoice.product.price
+                current_received = invoice.received
+
+                # Skip if product price is null and we're filtering
+                if product_price is None and filter_null_prices:
+                    skipped_count += 1
+                    continue
+
+                # Only update if values are different
+                if current_received != product_price:
+                    invoices_to_update.append(invoice)
+
+            if invoices_to_update:
+                # In dry run, just count what would be updated
+                updated_count += len(invoices_to_update)
+                for invoice in invoices_to_update[:5]:  # Show first 5 examples
                     self.stdout.write(
-                        f'Processed {processed_count}/{total_invoices} invoices '
-                        f'({(processed_count/total_invoices)*100:.1f}%)'
+                        f'Would update Invoice {invoice.id}: '
+                        f'received {invoice.received} -> {invoice.product.price}'
                     )
+                if len(invoices_to_update) > 5:
+                    self.stdout.write(f'... and {len(invoices_to_update) - 5} more in this batch')
+
+            processed_count += len(batch)
+
+            # Progress update every 5 batches
+            if processed_count % (batch_size * 5) == 0:
+                self.show_progress(processed_count, total_invoices, approx)
+
+        if processed_count == 0:
+            self.stdout.write(self.style.SUCCESS('No invoices to update'))
+            return
+        if processed_count % (batch_size * 5) != 0:
+            self.show_progress(processed_count, total_invoices, approx)
 
         # Summary
-        if dry_run:
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'DRY RUN COMPLETE: Would update {updated_count} invoices, '
-                    f'skip {skipped_count} invoices'
-                )
-            )
-        else:
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'Successfully updated {updated_count} invoices with product prices. '
-                    f'Skipped {skipped_count} invoices.'
-                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'DRY RUN COMPLETE: Would update {updated_count} invoices, '
+                f'skip {skipped_count} invoices'
             )
+        )
 
-        # Additional statistics
-        if not dry_run:
-            self.show_statistics()
+    def show_progress(self, processed_count, total_invoices, approx):
+        """Print how far the dry run has got against the (possibly estimated) total"""
+        message = f'Processed {processed_count}/{approx}{total_invoices} invoices'
+        if total_invoices:
+            message += f' ({approx}{(processed_count/total_invoices)*100:.1f}%)'
+        self.stdout.write(message)
+
+    def estimate_rows(self):
+        """Return the planner's row estimate for the invoice table, or None if unavailable"""
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [Invoice._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 for tables that have never been vacuumed or analyzed
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
+
+    def sync_in_database(self, filter_null_prices):
+        """Copy product.price into invoice.received for every out-of-sync invoice in one UPDATE"""
+        if connection.vendor == 'postgresql':
+            received = Invoice._meta.get_field('received').column
+            product_id = Invoice._meta.get_field('product').column
+            price = Product._meta.get_field('price').column
+            sql = (
+                f'UPDATE {Invoice._meta.db_table} AS i SET {received} = p.{price} '
+                f'FROM {Product._meta.db_table} AS p '
+                f'WHERE p.{Product._meta.pk.column} = i.{product_id} '
+                f'AND i.{received} IS DISTINCT FROM p.{price}'
+            )
+            if filter_null_prices:
+                sql += f' AND p.{price} IS NOT NULL'
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                return cursor.rowcount
+
+        # Other backends: a correlated subquery update through the ORM
+        # Match IS DISTINCT FROM: skip equal values and rows where both sides are NULL
+        queryset = (
+            Invoice.objects.exclude(received=models.F('product__price'))
+            .exclude(received__isnull=True, product__price__isnull=True)
+        )
+        if filter_null_prices:
+            queryset = queryset.exclude(product__price__isnull=True)
+        price = Product.objects.filter(pk=models.OuterRef('product_id')).values('price')[:1]
+        return queryset.update(received=models.Subquery(price))
 
     def show_statistics(self):
-        """Show useful statistics after the update"""
+        """Show useful statistics after the update
+
+        The received = product.price count relies on the (product, received)
+        index on Invoice (inv_product_received_idx) to avoid a heap scan.
+        """
         total_invoices = Invoice.objects.count()
         invoices_with_received = Invoice.objects.exclude(received__isnull=True).count()
         invoices_matching_price = Invoice.objects.filter(
@@ -138,4 +204,4 @@ class Command(BaseCommand):
 
         if total_invoices > 0:
             sync_percentage = (invoices_matching_price / total_invoices) * 100
-            self.stdout.write(f'Sync percentage: {sync_percentage:.1f}%') 
\ No newline at end of file
+            self.stdout.write(f'Sync percentage: {sync_percentage:.1f}%')
@@ -2,7 +2,7 @@ import re
 from typing import Optional
 
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import connection, transaction
 from django.db.models import Q
 
 from store.models import Product
@@ -23,6 +23,128 @@ MONTH_MAP = {
     'dec': 12, 'december': 12,
 }
 
+# Loose superset of every EXP_PATTERNS layout (surrounding whitespace allowed,
+# since values are stripped in Python); used to drop obvious garbage in SQL
+EXP_PREFILTER_REGEX = r'^\s*([A-Za-z]+|[0-9]{1,4})[-/]?[0-9]{1,4}\s*$'
+
+
+def _fuse_patterns(patterns):
+    """Combine the anchored expiry patterns into one alternation.
+
+    Each pattern becomes a named branch ``p<index>`` and its inner groups are
+    suffixed with the same index, so a single ``match`` both selects the
+    winning pattern (via ``lastindex``) and exposes its month/year groups.
+    """
+    branches = []
+    for index, pattern in enumerate(patterns):
+        body = pattern['regex'].pattern[1:-1]  # strip the ^...$ anchors
+        body = re.sub(r'\(\?P<(\w+)>', rf'(?P<\1_{index}>', body)
+        branches.append(f'(?P<p{index}>{body})')
+    return re.compile('^(?:' + '|'.join(branches) + ')$', re.IGNORECASE)
+
+
+def _pattern_meta(fused, patterns):
+    """Map each branch's group number in ``fused`` to its positional parse metadata.
+
+    Values are ``(month_group, year_group, year_length, separator, month_first)``
+    so the hot path can use ``match.lastindex`` and ``match[n]`` instead of
+    building group names or dicts per row. ``patterns`` must be text-month
+    patterns (``month_text``/``year`` groups).
+    """
+    meta = {}
+    for index, pattern in enumerate(patterns):
+        meta[fused.groupindex[f'p{index}']] = (
+            fused.groupindex[f'month_text_{index}'],
+            fused.groupindex[f'year_{index}'],
+            pattern['year_length'],
+            pattern['separator'],
+            pattern['month_first'],
+        )
+    return meta
+
+
+def _bucket_update_sql(pattern, table, pk_column):
+    """Build a Postgres UPDATE that rewrites every expiry value in one format bucket.
+
+    The statement mirrors ``Command._calculate_new_expiry`` for a single entry of
+    ``EXP_PATTERNS``. Returns ``(sql, regex)``; the SQL takes the named parameters
+    ``regex`` and ``years``.
+    """
+    names = re.findall(r'\(\?P<(\w+)>', pattern['regex'].pattern)
+    regex = re.sub(r'\(\?P<\w+>', '(', pattern['regex'].pattern).replace(r'\d', '[0-9]')
+    month_ref = f"m[{names.index('month_text' if pattern['month_type'] == 'text' else 'month') + 1}]"
+    year_ref = f"m[{names.index('year') + 1}]"
+
+    if pattern['month_type'] == 'text':
+        month_keys = ', '.join(f"'{key}'" for key in MONTH_MAP)
+        valid_month = f'lower({month_ref}) IN ({month_keys})'
+        formatted_month = f'upper(left({month_ref}, 1)) || lower(substr({month_ref}, 2))'
+    else:
+        valid_month = f'{month_ref}::int BETWEEN 1 AND 12'
+        formatted_month = f"lpad({month_ref}::int::text, 2, '0')"
+
+    if pattern['year_length'] == 2:
+        formatted_year = f"lpad((({year_ref}::int + %(years)s) %% 100)::text, 2, '0')"
+    else:
+        new_year = f'({year_ref}::int + %(years)s)::text'
+        formatted_year = f"lpad({new_year}, greatest(4, length({new_year})), '0')"
+
+    parts = [formatted_month, formatted_year] if pattern['month_first'] else [formatted_year, formatted_month]
+    new_exp = f" || '{pattern['separator']}' || ".join(parts)
+    # Strip surrounding whitespace like the Python path does (chr(11) is \v)
+    stripped = "btrim(exp, E' \\t\\n\\r\\f' || chr(11))"
+
+    sql = (
+        f'UPDATE {table} AS p SET exp = b.new_exp '
+        f'FROM ('
+        f'SELECT row_id, stripped, {new_exp} AS new_exp '
+        f'FROM ('
+        f'SELECT {pk_column} AS row_id, {stripped} AS stripped, regexp_match({stripped}, %(regex)s) AS m '
+        f'FROM {table}'
+        f') AS s '
+        f'WHERE m IS NOT NULL AND {valid_month}'
+        f') AS b '
+        f'WHERE p.{pk_column} = b.row_id AND b.new_exp <> b.stripped'
+    )
+    return sql, regex
+
+
+def _parse_numeric_fast(value):
+    """Parse a purely numeric expiry value without the regex engine.
+
+    Accepts the same layouts as the numeric entries of ``EXP_PATTERNS`` (M/YY,
+    MM-YYYY, YYYY/MM, MMYY, MMYYYY, ...) and returns
+    ``(month, year, year_length, separator, month_first)`` or None.
+    """
+    separator = '/'
+    sep_pos = value.find('/')
+    if sep_pos < 0:
+        separator = '-'
+        sep_pos = value.find('-')
+
+    if sep_pos < 0:
+        # MMyy / MMYYYY
+        if not value.isdecimal() or len(value) not in (4, 6):
+            return None
+        month, year = int(value[:2]), int(value[2:])
+        year_length, separator, month_first = len(value) - 2, '', True
+    else:
+        left, right = value[:sep_pos], value[sep_pos + 1:]
+        if not (left.isdecimal() and right.isdecimal()):
+            return None
+        if len(left) <= 2 and len(right) in (2, 4):
+            month, year = int(left), int(right)
+            year_length, month_first = len(right), True
+        elif len(left) == 4 and len(right) <= 2:
+            month, year = int(right), int(left)
+            year_length, month_first = 4, False
+        else:
+            return None
+
+    if month < 1 or month > 12:
+        return None
+    return month, year, year_length, separator, month_first
+
 
 class Command(BaseCommand):
     help = (
@@ -129,6 +251,11 @@ class Command(BaseCommand):
         },
     )
 
+    # Numeric layouts are handled by _parse_numeric_fast; only text months use the regex
+    TEXT_EXP_PATTERNS = tuple(p for p in EXP_PATTERNS if p['month_type'] == 'text')
+    FUSED_EXP_PATTERN = _fuse_patterns(TEXT_EXP_PATTERNS)
+    PATTERN_META = _pattern_meta(FUSED_EXP_PATTERN, TEXT_EXP_PATTERNS)
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--years',
@@ -164,6 +291,11 @@ class Command(BaseCommand):
             default=0,
             help='Show N examples of unmatched expiry formats (default: 0)',
         )
+        parser.add_argument(
+            '--python-fallback',
+            action='store_true',
+            help='Parse and rewrite values in Python instead of set-based SQL updates',
+        )
 
     def handle(self, *args, **options):
         years_to_add = options['years']
@@ -221,10 +353,38 @@ class Command(BaseCommand):
         self.stdout.write(
             f'Processing {total_candidates} products with non-empty expiry values...'
         )
+
+        # Real runs on Postgres rewrite each format bucket server-side; dry runs and
+        # unmatched-format reporting need the per-row Python path
+        use_sql = (
+            connection.vendor == 'postgresql'
+            and not dry_run
+            and not options.get('python_fallback')
+            and not options.get('show_unmatched')
+        )
+        if use_sql:
+            try:
+                with transaction.atomic():
+                    updated_count = self._update_in_database(years_to_add)
+            except Exception as exc:
+                raise CommandError(f'An error occurred during processing: {exc}') from exc
+
+            self.stdout.write('')
+            self.stdout.write('--- Summary ---')
+            self.stdout.write(f'Total processed: {total_candidates}')
+            self.stdout.write(f'Updated: {updated_count}')
+            self.stdout.write(
+                f'Not updated (unchanged or unrecognized format): {total_candidates - updated_count}'
+            )
+            self.stdout.write(self.style.SUCCESS('Expiry values updated successfully.'))
+            return
+
         if dry_run:
             self.stdout.write(self.style.WARNING('DRY RUN: No changes will be committed.'))
 
-        pending_updates = []
+        # Fixed-size buffer reused for every bulk update batch
+        pending_updates = [None] * batch_size
+        pending_count = 0
         sample_updates = []
         updated_count = 0
         skipped_count = 0
@@ -233,6 +393,12 @@ class Command(BaseCommand):
         unmatched_samples = []
         show_unmatched = options.get('show_unmatched', 0)
 
+        # On Postgres, let the database discard values no pattern could match so
+        # they never reach Python (unless we've been asked to show them)
+        prefilter = connection.vendor == 'postgresql' and not show_unmatched
+        if prefilter:
+            queryset = queryset.filter(exp__regex=EXP_PREFILTER_REGEX)
+
         iterator = queryset.iterator(chunk_size=batch_size)
 
         try:
@@ -258,19 +424,20 @@ class Command(BaseCommand):
 
                     if not dry_run:
                         product.exp = new_exp
-                        pending_updates.append(product)
+                        pending_updates[pending_count] = product
+                        pending_count += 1
 
-                        if len(pending_updates) >= batch_size:
+                        if pending_count == batch_size:
                             Product.objects.bulk_update(
                                 pending_updates,
                                 ['exp'],
                                 batch_size=batch_size,
                             )
-                            pending_updates.clear()
+                            pending_count = 0
 
-                if not dry_run and pending_updates:
+                if not dry_run and pending_count:
                     Product.objects.bulk_update(
-                        pending_updates,
+                        pending_updates[:pending_count],
                         ['exp'],
                         batch_size=batch_size,
                     )
@@ -287,6 +454,10 @@ class Command(BaseCommand):
         self.stdout.write(f'Updated: {updated_count}')
         self.stdout.write(f'Unchanged (already up to date): {unchanged_count}')
         self.stdout.write(f'Skipped (unrecognized format): {skipped_count}')
+        if prefilter:
+            self.stdout.write(
+                f'Skipped by database prefilter (unrecognized format): {total_candidates - processed_count}'
+            )
 
         if unmatched_samples:
             self.stdout.write('')
@@ -307,6 +478,18 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.SUCCESS('Expiry values updated successfully.'))
 
+    def _update_in_database(self, years_to_add: int) -> int:
+        """Apply the expiry shift with one UPDATE per format bucket and return the row count."""
+        table = Product._meta.db_table
+        pk_column = Product._meta.pk.column
+        updated = 0
+        with connection.cursor() as cursor:
+            for pattern in self.EXP_PATTERNS:
+                sql, regex = _bucket_update_sql(pattern, table, pk_column)
+                cursor.execute(sql, {'regex': regex, 'years': years_to_add})
+                updated += cursor.rowcount
+        return updated
+
     def _calculate_new_expiry(self, exp_value: str, years_to_add: int) -> Optional[str]:
         """Return the adjusted expiry string or None if it cannot be parsed."""
         if not exp_value:
@@ -316,79 +499,62 @@ class Command(BaseCommand):
         if not exp_value:
             return None
 
-        for pattern in self.EXP_PATTERNS:
-            match = pattern['regex'].match(exp_value)
-            if not match:
-                continue
-
-            month_type = pattern.get('month_type', 'numeric')
-            year_str = match.groupdict().get('year')
-
-            # Handle text month names
-            if month_type == 'text':
-                month_text = match.groupdict().get('month_text')
-                if not month_text:
-                    continue
-                
-                month_lower = month_text.lower()
-                month = MONTH_MAP.get(month_lower)
-                if month is None:
-                    continue
-                
-                # Preserve original capitalization style (first letter capitalized)
-                original_month_text = month_text
-                
-            else:
-                # Handle numeric months
-                month_str = match.groupdict().get('month')
-                if not month_str:
-                    continue
-                
-                try:
-                    month = int(month_str)
-                except (TypeError, ValueError):
-                    continue
-                
-                if month < 1 or month > 12:
-                    continue
-                
-                original_month_text = None
+        # Numeric formats can only start with a digit; scan those by hand and keep
+        # the regex for text month names
+        if exp_value[0].isdecimal():
+            parsed = _parse_numeric_fast(exp_value)
+            if parsed is None:
+                return None
+            month, year, year_length, separator, month_first = parsed
+            return self._format_expiry(
+                f"{month:02d}", year + years_to_add, year_length, separator, month_first
+            )
+
+        match = self.FUSED_EXP_PATTERN.match(exp_value)
+        if not match:
+            return None
 
-            try:
-                year = int(year_str)
-            except (TypeError, ValueError):
-                continue
-
-            new_year = year + years_to_add
-            year_length = pattern['year_length']
-            separator = pattern['separator']
-            month_first = pattern['month_first']
-
-            # Handle 2-digit years
-            if year_length == 2:
-                new_year %= 100
-                formatted_year = f"{new_year:02d}"
-            else:
-                formatted_year = f"{new_year:04d}"
-
-            # Format the output maintaining original structure
-            if month_type == 'text':
-                # For text months, preserve the original capitalization
-                # Capitalize first letter, lowercase the rest
-                formatted_month = original_month_text[0].upper() + original_month_text[1:].lower()
-            else:
-                formatted_month = f"{month:02d}"
-            
-            if separator:
-                if month_first:
-                    return f"{formatted_month}{separator}{formatted_year}"
-                else:
-                    return f"{formatted_year}{separator}{formatted_month}"
-            else:
-                # No separator case
-                if month_first:
-                    return f"{formatted_month}{formatted_year}"
-                else:
-                    return f"{formatted_year}{formatted_month}"
+        month_group, year_group, year_length, separator, month_first = (
+            self.PATTERN_META[match.lastindex]
+        )
+        year_str = match[year_group]
+        month_text = match[month_group]
+
+        # Most values are already lowercase; only lower() on a miss
+        month = MONTH_MAP.get(month_text)
+        if month is None:
+            month = MONTH_MAP.get(month_text.lower())
+        if month is None:
+            return None
 
-        return None
+        # Preserve the original month text, capitalized (first letter upper, rest lower)
+        formatted_month = month_text[0].upper() + month_text[1:].lower()
+
+        try:
+            year = int(year_str)
+        except (TypeError, ValueError):
+            return None
+
+        return self._format_expiry(
+            formatted_month, year + years_to_add, year_length, separator, month_first
+        )
+
+    def _format_expiry(
+        self,
+        formatted_month: str,
+        new_year: int,
+        year_length: int,
+        separator: str,
+        month_first: bool,
+    ) -> str:
+        """Assemble an expiry string in the same layout it was parsed from."""
+        # Handle 2-digit years
+        if year_length == 2:
+            new_year %= 100
+            formatted_year = f"{new_year:02d}"
+        else:
+            formatted_year = f"{new_year:04d}"
+
+        if month_first:
+            return f"{formatted_month}{separator}{formatted_year}"
+        return f"{formatted_year}{separator}{formatted_month}"
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-15 22:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0005_productexport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productexport',
+            name='started',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Trigram index on UPPER(name::text), the expression Django emits on
+# PostgreSQL for name__icontains. It covers the product__name term of the
+# InvoiceAdmin search and the name term of the ProductAdmin search, which is
+# also what the product autocomplete on the invoice form queries. ProductAdmin
+# ORs name with price and category__name, which stay unindexed, so that search
+# can still fall back to a scan. No-op on other database backends.
+
+from django.db import migrations
+
+INDEX_NAME = 'product_name_upper_trgm'
+
+
+def create_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON store_product USING gin (upper(name::text) gin_trgm_ops)'
+    )
+
+
+def drop_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_productexport_started'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_index, drop_trgm_index),
+    ]
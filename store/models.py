@@ -1,4 +1,7 @@
+from datetime import timedelta
+
 from django.db import models
+from django.utils import timezone
 from django.urls import reverse
 from django.utils.text import slugify
 from accounts.models import Customer
@@ -83,4 +86,33 @@ class Comment(models.Model):
         ordering = ('created',)
     
     def __str__(self):
-        return f'Comment by {self.name}'       
\ No newline at end of file
+        return f'Comment by {self.name}'       
+#Product Export Model
+class ProductExport(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    )
+    status = models.CharField(choices=STATUS_CHOICES, default='pending', max_length=20)
+    file = models.FileField(null=True, blank=True, upload_to='exports/')
+    rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(Customer, related_name='product_exports', on_delete=models.SET_NULL, blank=True, null=True)
+    # Exports run on a thread in the web worker; one that hasn't finished in this
+    # long was most likely lost to a worker restart
+    STALE_AFTER = timedelta(hours=1)
+    class Meta:
+        ordering = ('-created',)
+
+    @property
+    def is_stale(self):
+        if self.status not in ('pending', 'running'):
+            return False
+        return (self.started or self.created) < timezone.now() - self.STALE_AFTER
+
+    def __str__(self):
+        return f'Product export {self.pk} ({self.status})'
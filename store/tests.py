@@ -1,3 +1,193 @@
-from django.test import TestCase
+import gzip
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Customer
+from store.management.commands import generate_random_invoices
+from payment.models import Invoice
+from store.management.commands.update_product_expiry import Command as UpdateProductExpiryCommand
+from store.models import Category, Product, ProductExport
+
+
+class CalculateNewExpiryTests(SimpleTestCase):
+    def setUp(self):
+        self.command = UpdateProductExpiryCommand()
+
+    def test_supported_layouts(self):
+        cases = {
+            # Text months, dash / slash, 2- and 4-digit years
+            'Aug-29': 'Aug-32',
+            'august-29': 'August-32',
+            'AUG-2029': 'Aug-2032',
+            'Sept/29': 'Sept/32',
+            'dec/2099': 'Dec/2102',
+            # MM/YY, M/YY, MM-YY
+            '08/29': '08/32',
+            '8/29': '08/32',
+            '12-98': '12-01',
+            # MM/YYYY, MM-YYYY
+            '08/2029': '08/2032',
+            '8-2029': '08-2032',
+            # YYYY/MM, YYYY-M
+            '2029/08': '2032/08',
+            '2029-8': '2032-08',
+            # MMyy, MMYYYY
+            '0829': '0832',
+            '082029': '082032',
+            # Surrounding whitespace is ignored
+            ' 08/29 ': '08/32',
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(self.command._calculate_new_expiry(value, 3), expected)
+
+    def test_rejected_values(self):
+        for value in ['', '   ', '13/29', '00/29', '123/29', '08/299', '1329', '08/29/30',
+                      'Foo-29', 'Aug29', 'Aug-299', '2029/13', 'garbage']:
+            with self.subTest(value=value):
+                self.assertIsNone(self.command._calculate_new_expiry(value, 3))
+
+
+class SyncInvoicePricesTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create_user('buyer@example.com', 'buyer', 'password')
+        category = Category.objects.create(name='Cards')
+        priced = Product.objects.create(category=category, name='Visa', price=5)
+        unpriced = Product.objects.create(category=category, name='Amex', price=None)
+
+        def invoice(product, received):
+            return Invoice.objects.create(
+                product=product, created_by=customer, order_id='INV', received=received
+            )
+
+        self.missing_received = invoice(priced, None)
+        self.missing_price = invoice(unpriced, 3)
+        self.both_null = invoice(unpriced, None)
+        self.in_sync = invoice(priced, 5)
+
+    def sync(self, *args):
+        out = StringIO()
+        call_command('sync_invoice_prices', *args, stdout=out)
+        return out.getvalue()
+
+    def test_updates_only_out_of_sync_invoices(self):
+        self.assertIn('Successfully updated 2 invoices', self.sync())
+        self.missing_received.refresh_from_db()
+        self.missing_price.refresh_from_db()
+        self.assertEqual(self.missing_received.received, 5)
+        self.assertIsNone(self.missing_price.received)
+
+        self.assertIn('Successfully updated 0 invoices', self.sync())
+
+    def test_filter_null_prices_leaves_unpriced_products_alone(self):
+        self.assertIn('Successfully updated 1 invoices', self.sync('--filter-null-prices'))
+        self.missing_price.refresh_from_db()
+        self.assertEqual(self.missing_price.received, 3)
+
+
+class GenerateRandomInvoicesTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Cards')
+        self.product = Product.objects.create(category=category, name='Visa', price=5)
+        Product.objects.create(category=category, name='Amex', price=5, Status=False)
+        self.customer = Customer.objects.create_user(
+            'buyer@example.com', 'buyer', 'password', is_active=True
+        )
+        Customer.objects.create_user('gone@example.com', 'gone', 'password', is_active=False)
+        # Don't leave this test's ids in the per-process pools
+        self.addCleanup(generate_random_invoices._active_product_ids.cache_clear)
+        self.addCleanup(generate_random_invoices._active_customer_ids.cache_clear)
+
+    def test_generates_batches_of_valid_rows(self):
+        call_command(
+            'generate_random_invoices', '2500',
+            '--start-date', '2024-01-01', '--end-date', '2024-01-31',
+            '--batch-size', '1000', '--refresh-pools',
+            stdout=StringIO(),
+        )
+
+        invoices = Invoice.objects.all()
+        self.assertEqual(invoices.count(), 2500)
+        self.assertEqual(set(invoices.values_list('product_id', flat=True)), {self.product.pk})
+        self.assertEqual(set(invoices.values_list('created_by_id', flat=True)), {self.customer.pk})
+
+        first_day = timezone.make_aware(datetime(2024, 1, 1))
+        last_day = timezone.make_aware(datetime(2024, 1, 31))
+        for created_at, order_id, txid in invoices.values_list('created_at', 'order_id', 'txid'):
+            self.assertTrue(first_day <= created_at <= last_day, created_at)
+            self.assertRegex(order_id, r'^INV-[A-Z2-7]{12}$')
+            if txid is not None:
+                self.assertRegex(txid, r'^[0-9a-f]{64}$')
+
+
+class _InlineThread:
+    """Stand-in for threading.Thread that runs the target when started"""
+    def __init__(self, target, args=(), daemon=None):
+        self.target, self.args = target, args
+
+    def start(self):
+        self.target(*self.args)
+
+
+class ProductExportApiTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            DEFAULT_FILE_STORAGE='django.core.files.storage.FileSystemStorage',
+            MEDIA_ROOT=self.media_root,
+            MEDIA_URL='/media/',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        admin = Customer.objects.create_superuser('admin@example.com', 'admin', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+        category = Category.objects.create(name='Cards')
+        Product.objects.create(category=category, name='Visa', exp='08/29', price=5)
+
+    def test_export_runs_and_redirects_to_file(self):
+        with mock.patch('store.exports.threading.Thread', _InlineThread):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('api_product_export'))
+
+        self.assertEqual(response.status_code, 202)
+        export_id = response.data['file_id']
+        self.assertTrue(response.data['status_url'].endswith(
+            reverse('api_product_export_detail', args=[export_id])
+        ))
+
+        export = ProductExport.objects.get(pk=export_id)
+        self.assertEqual(export.status, 'ready')
+        self.assertEqual(export.rows, 1)
+        with export.file.open('rb') as file, gzip.open(file, 'rt') as csv_file:
+            lines = csv_file.read().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['category_name', 'category_location'])
+        self.assertIn('Visa', lines[1])
+
+        response = self.client.get(reverse('api_product_export_detail', args=[export_id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], export.file.url)
+
+    def test_unfinished_export_is_reported_stale(self):
+        export = ProductExport.objects.create(status='running', started=timezone.now() - timedelta(hours=2))
+
+        response = self.client.get(reverse('api_product_export_detail', args=[export.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'stale')
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(reverse('api_product_export'))
+        self.assertIn(response.status_code, (401, 403))
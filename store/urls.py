@@ -9,4 +9,6 @@ urlpatterns = [
     path('comments/', CommentListView.as_view(), name='api_comment_list'),
     path('delete-comment/<int:pk>/', DeleteComment.as_view(), name='api_delete_comment'),
     path('user-comments/', UserCommentsListView.as_view(), name='api_user_comments'),
+    path('exports/products/', ProductExportCreateView.as_view(), name='api_product_export'),
+    path('exports/products/<int:pk>/', ProductExportDetailView.as_view(), name='api_product_export_detail'),
 ]
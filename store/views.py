@@ -3,6 +3,9 @@ from .models import *
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.authentication import TokenAuthentication
+from django.shortcuts import redirect
+from django.urls import reverse
+from .exports import start_product_export
 
 class CategoryList(generics.ListCreateAPIView):
     queryset = Category.objects.all().exclude(name__in=["Extraction", "Dumps"])
@@ -83,4 +86,36 @@ class DeleteComment(generics.DestroyAPIView):
             comment.save()
             return Response(status=status.HTTP_204_NO_CONTENT)
         else:
-            return Response(status=status.HTTP_403_FORBIDDEN)
\ No newline at end of file
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+class ProductExportCreateView(generics.GenericAPIView):
+    permission_classes = (permissions.IsAdminUser,)
+    authentication_classes = (TokenAuthentication,)
+
+    def post(self, request, *args, **kwargs):
+        export = start_product_export(request.user)
+        return Response(
+            {
+                'file_id': export.pk,
+                'status_url': request.build_absolute_uri(
+                    reverse('api_product_export_detail', args=[export.pk])
+                ),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+class ProductExportDetailView(generics.GenericAPIView):
+    queryset = ProductExport.objects.all()
+    permission_classes = (permissions.IsAdminUser,)
+    authentication_classes = (TokenAuthentication,)
+
+    def get(self, request, *args, **kwargs):
+        export = self.get_object()
+        if export.status == 'ready':
+            return redirect(export.file.url)
+        return Response({
+            'file_id': export.pk,
+            'status': 'stale' if export.is_stale else export.status,
+            'started': export.started,
+            'error': export.error,
+        })